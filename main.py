@@ -1,10 +1,18 @@
 #!/usr/bin/env python3
 import argparse
-import json
 import logging
 import re
+import signal
+import sys
+import threading
 import time
 from subprocess import check_output, CalledProcessError
+
+try:
+    import orjson as json
+except ImportError:
+    import json
+
 from prometheus_client import (
     start_http_server,
     Gauge,
@@ -12,6 +20,9 @@ from prometheus_client import (
     PROCESS_COLLECTOR,
     PLATFORM_COLLECTOR,
 )
+from prometheus_client.registry import Collector
+
+import rsmi
 
 logger = logging.getLogger("rocm_smi_exporter")
 handler = logging.StreamHandler()
@@ -37,102 +48,121 @@ gpuEdgeTemperature = Gauge(
     "rocm_smi_edge_temperature_celsius",
     "Edge temperature (°C)",
     ["device_name", "device_id", "subsystem_id"],
+    registry=None,
 )
 gpuJunctionTemperature = Gauge(
     "rocm_smi_hotspot_temperature_celsius",
     "Hotspot/junction temperature (°C)",
     ["device_name", "device_id", "subsystem_id"],
+    registry=None,
 )
 gpuMemTemperature = Gauge(
     "rocm_smi_memory_temperature_celsius",
     "Memory temperature (°C)",
     ["device_name", "device_id", "subsystem_id"],
+    registry=None,
 )
 
 gpuUsage = Gauge(
     "rocm_smi_gpu_usage_percent",
     "GPU usage (%)",
     ["device_name", "device_id", "subsystem_id"],
+    registry=None,
 )
 gpuVRAMUsage = Gauge(
     "rocm_smi_vram_allocation_percent",
     "VRAM allocation (%)",
     ["device_name", "device_id", "subsystem_id"],
+    registry=None,
 )
 umcActivity = Gauge(
     "rocm_smi_umc_activity_percent",
     "UMC (memory controller) activity (%)",
     ["device_name", "device_id", "subsystem_id"],
+    registry=None,
 )
 mmActivity = Gauge(
     "rocm_smi_mm_activity_percent",
     "Multimedia activity (%)",
     ["device_name", "device_id", "subsystem_id"],
+    registry=None,
 )
 
 socketPowerNow = Gauge(
     "rocm_smi_socket_power_watts",
     "Current socket power (W)",
     ["device_name", "device_id", "subsystem_id"],
+    registry=None,
 )
 socketPowerAvg = Gauge(
     "rocm_smi_socket_power_average_watts",
     "Average socket power (W)",
     ["device_name", "device_id", "subsystem_id"],
+    registry=None,
 )
 pkgPowerAvg = Gauge(
     "rocm_smi_gfx_package_power_average_watts",
     "Average graphics package power (W)",
     ["device_name", "device_id", "subsystem_id"],
+    registry=None,
 )
 pkgPowerMax = Gauge(
     "rocm_smi_gfx_package_power_max_watts",
     "Max graphics package power (W)",
     ["device_name", "device_id", "subsystem_id"],
+    registry=None,
 )
 
 voltageMilliV = Gauge(
     "rocm_smi_voltage_millivolt",
     "Voltage (mV)",
     ["device_name", "device_id", "subsystem_id", "rail"],
+    registry=None,
 )
 fanRpm = Gauge(
     "rocm_smi_fan_speed_rpm",
     "Fan speed (RPM)",
     ["device_name", "device_id", "subsystem_id"],
+    registry=None,
 )
 
 clkCurrentMHz = Gauge(
     "rocm_smi_clock_current_mhz",
     "Current clock (MHz)",
     ["device_name", "device_id", "subsystem_id", "clock"],
+    registry=None,
 )
 clkAverageMHz = Gauge(
     "rocm_smi_clock_average_mhz",
     "Average clock (MHz)",
     ["device_name", "device_id", "subsystem_id", "clock"],
+    registry=None,
 )
 
 pcieWidthLanes = Gauge(
     "rocm_smi_pcie_link_width_lanes",
     "PCIe link width (lanes)",
     ["device_name", "device_id", "subsystem_id"],
+    registry=None,
 )
 pcieSpeedGTs = Gauge(
     "rocm_smi_pcie_link_speed_gtps",
     "PCIe link speed (GT/s)",
     ["device_name", "device_id", "subsystem_id"],
+    registry=None,
 )
 
 energyAccumulatorUJ = Gauge(
     "rocm_smi_energy_accumulator_uj",
     "Energy accumulator (µJ units per header)",
     ["device_name", "device_id", "subsystem_id"],
+    registry=None,
 )
 accumulatedEnergyUJ = Gauge(
     "rocm_smi_accumulated_energy_uj",
     "Accumulated energy (µJ)",
     ["device_name", "device_id", "subsystem_id"],
+    registry=None,
 )
 
 deviceInfo = Gauge(
@@ -147,30 +177,76 @@ deviceInfo = Gauge(
         "card_series",
         "card_vendor",
     ],
+    registry=None,
 )
 softwareInfo = Gauge(
     "rocm_smi_software_info",
     "Software versions",
     ["driver_version", "rocm_smi_version", "rocm_smi_lib_version"],
+    registry=None,
+)
+lastRefreshTs = Gauge(
+    "rocm_smi_last_scrape_timestamp_seconds",
+    "Unix time of the last successful GPU metrics refresh",
+    registry=None,
+)
+
+# gauge'и не регистрируются сами — их отдаёт RocmSmiCollector после снимка
+_GAUGES = (
+    gpuEdgeTemperature,
+    gpuJunctionTemperature,
+    gpuMemTemperature,
+    gpuUsage,
+    gpuVRAMUsage,
+    umcActivity,
+    mmActivity,
+    socketPowerNow,
+    socketPowerAvg,
+    pkgPowerAvg,
+    pkgPowerMax,
+    voltageMilliV,
+    fanRpm,
+    clkCurrentMHz,
+    clkAverageMHz,
+    pcieWidthLanes,
+    pcieSpeedGTs,
+    energyAccumulatorUJ,
+    accumulatedEnergyUJ,
+    deviceInfo,
+    softwareInfo,
+    lastRefreshTs,
 )
 
 # ===== helpers =====
 _rx_number = re.compile(r"[-+]?\d+(?:\.\d+)?")
 
 
+_NA_SET = frozenset(["N/A", "n/a", "NA", "na", ""])
+
+
 def _is_na(v) -> bool:
-    if v is None:
-        return True
-    s = str(v).strip()
-    return s == "" or s.upper() == "N/A"
+    # без str()/strip()/upper(): значения rocm-smi уже без пробелов.
+    # не-строки (list/dict) в set не проверяем — они могут быть unhashable
+    if not isinstance(v, str):
+        return v is None
+    return v in _NA_SET
 
 
 def _to_float(v, *, scale=1.0):
-    if _is_na(v):
+    if v is None or v == "N/A":
         return None
     if isinstance(v, (int, float)):
         return float(v) * scale
-    m = _rx_number.search(str(v))
+    s = str(v)
+    # почти все значения rocm-smi — чистые числа, regex только для "45.0c".
+    # Без regex берём только то, что _rx_number съел бы целиком
+    # ([-+]?\d+(\.\d+)?); ".5", "1e3", "nan", "1_000" float() понял бы
+    # иначе — их разбирает regex, как раньше
+    digits = s[1:] if s[:1] in "+-" else s
+    int_part, dot, frac = digits.partition(".")
+    if int_part.isdecimal() and (not dot or frac.isdecimal()):
+        return float(s) * scale
+    m = _rx_number.search(s)
     return float(m.group(0)) * scale if m else None
 
 
@@ -189,18 +265,147 @@ def _pick_label(d: dict, keys: list[str], default="unknown"):
     return default
 
 
-def _set_if_not_none(gauge: Gauge, labels: dict, value):
-    if value is None:
-        return
-    try:
-        gauge.labels(**labels).set(float(value))
-    except Exception as e:
-        logger.debug(f"skip set {gauge._name}: {e}")
+_VOLTAGE_RAILS = (
+    ("voltage_soc (mV)", "soc"),
+    ("voltage_gfx (mV)", "gfx"),
+    ("voltage_mem (mV)", "mem"),
+    ("Voltage (mV)", "vcore"),
+)
+_CLOCKS_CURRENT = (
+    ("current_gfxclk (MHz)", "gfxclk"),
+    ("current_socclk (MHz)", "socclk"),
+    ("current_uclk (MHz)", "uclk"),
+    ("current_vclk0 (MHz)", "vclk0"),
+    ("current_dclk0 (MHz)", "dclk0"),
+)
+_CLOCKS_AVERAGE = (
+    ("average_gfxclk_frequency (MHz)", "gfxclk"),
+    ("average_socclk_frequency (MHz)", "socclk"),
+    ("average_uclk_frequency (MHz)", "uclk"),
+    ("average_vclk0_frequency (MHz)", "vclk0"),
+    ("average_dclk0_frequency (MHz)", "dclk0"),
+)
 
+# (имя child, ключи-кандидаты по приоритету, множитель); кандидатов
+# несколько там, где разные версии rocm-smi называют метрику по-разному
+_METRIC_SPEC = (
+    (
+        "edge_temp",
+        ("Temperature (Sensor edge) (C)", "temperature_edge (C)"),
+        1.0,
+    ),
+    (
+        "junction_temp",
+        ("Temperature (Sensor junction) (C)", "temperature_hotspot (C)"),
+        1.0,
+    ),
+    (
+        "mem_temp",
+        ("Temperature (Sensor memory) (C)", "temperature_mem (C)"),
+        1.0,
+    ),
+    ("gpu_usage", ("GPU use (%)", "average_gfx_activity (%)"), 1.0),
+    ("vram_usage", ("GPU Memory Allocated (VRAM%)",), 1.0),
+    ("umc_activity", ("average_umc_activity (%)",), 1.0),
+    ("mm_activity", ("average_mm_activity (%)",), 1.0),
+    (
+        "socket_power_now",
+        (
+            "Current Socket Graphics Package Power (W)",
+            "current_socket_power (W)",
+        ),
+        1.0,
+    ),
+    ("socket_power_avg", ("average_socket_power (W)",), 1.0),
+    ("pkg_power_avg", ("Average Graphics Package Power (W)",), 1.0),
+    ("pkg_power_max", ("Max Graphics Package Power (W)",), 1.0),
+    *((f"voltage_{rail}", (key,), 1.0) for key, rail in _VOLTAGE_RAILS),
+    ("fan_rpm", ("current_fan_speed (rpm)",), 1.0),
+    *((f"clk_cur_{cname}", (key,), 1.0) for key, cname in _CLOCKS_CURRENT),
+    *((f"clk_avg_{cname}", (key,), 1.0) for key, cname in _CLOCKS_AVERAGE),
+    ("pcie_width", ("pcie_link_width (Lanes)",), 1.0),
+    ("pcie_speed", ("pcie_link_speed (0.1 GT/s)",), 0.1),
+    (
+        "energy_acc",
+        ("energy_accumulator (15.259uJ (2^-16))", "Energy counter"),
+        1.0,
+    ),
+    ("energy_total", ("Accumulated Energy (uJ)",), 1.0),
+)
 
-def _get_versions():
+# card -> {имя child: выбранный ключ-кандидат}; сбрасывается при смене
+# драйвера. Кэшируется только выбор ключа, а не его наличие: если ключа
+# на этом снимке нет, метрика пропускается и ищется заново на следующем
+_resolved_keys: dict[str, dict[str, str]] = {}
+
+
+# имя child -> (gauge, значения дополнительных labels)
+_CHILD_SPECS = {
+    "edge_temp": (gpuEdgeTemperature, ()),
+    "junction_temp": (gpuJunctionTemperature, ()),
+    "mem_temp": (gpuMemTemperature, ()),
+    "gpu_usage": (gpuUsage, ()),
+    "vram_usage": (gpuVRAMUsage, ()),
+    "umc_activity": (umcActivity, ()),
+    "mm_activity": (mmActivity, ()),
+    "socket_power_now": (socketPowerNow, ()),
+    "socket_power_avg": (socketPowerAvg, ()),
+    "pkg_power_avg": (pkgPowerAvg, ()),
+    "pkg_power_max": (pkgPowerMax, ()),
+    "fan_rpm": (fanRpm, ()),
+    "pcie_width": (pcieWidthLanes, ()),
+    "pcie_speed": (pcieSpeedGTs, ()),
+    "energy_acc": (energyAccumulatorUJ, ()),
+    "energy_total": (accumulatedEnergyUJ, ()),
+}
+for _, _rail in _VOLTAGE_RAILS:
+    _CHILD_SPECS[f"voltage_{_rail}"] = (voltageMilliV, (_rail,))
+for _, _cname in _CLOCKS_CURRENT:
+    _CHILD_SPECS[f"clk_cur_{_cname}"] = (clkCurrentMHz, (_cname,))
+for _, _cname in _CLOCKS_AVERAGE:
+    _CHILD_SPECS[f"clk_avg_{_cname}"] = (clkAverageMHz, (_cname,))
+
+
+class _Children(dict):
+    """Gauge children одной карты: labels() вызывается один раз на метрику.
+
+    Child создаётся при первом значении, а не заранее, — иначе метрики,
+    которых у карты нет, экспортировались бы нулями.
+    """
+
+    def __init__(self, label_values: tuple):
+        super().__init__()
+        # (device_name, device_id, subsystem_id) — порядок как в labelnames
+        self.label_values = label_values
+        # последнее выставленное значение по имени child
+        self.last: dict[str, float] = {}
+
+    def __missing__(self, name):
+        gauge, extra = _CHILD_SPECS[name]
+        child = self[name] = gauge.labels(*self.label_values, *extra)
+        return child
+
+
+# (device_name, device_id, subsystem_id) -> children. Одинаковые карты
+# дают одинаковый набор labels и, как и раньше, делят одну серию метрик
+_bound: dict[tuple, _Children] = {}
+
+
+def _set(children: _Children, name: str, value):
+    # value уже float из _to_float; неизменившееся значение не перезаписываем
+    if value is not None and children.last.get(name) != value:
+        children[name].set(value)
+        children.last[name] = value
+
+
+def _get_versions(lib=None):
     rsmi_ver = ""
     rlib_ver = ""
+    if lib is not None:
+        try:
+            rlib_ver = lib.version()
+        except rsmi.RSMIError as e:
+            logger.warning(f"rsmi_version_get failed: {e}")
     try:
         out = check_output(
             ["rocm-smi", "-V"], text=True, encoding="utf-8", errors="ignore"
@@ -208,75 +413,83 @@ def _get_versions():
         m1 = re.search(r"ROCM-SMI version:\s*(.+)", out)
         m2 = re.search(r"ROCM-SMI-LIB version:\s*(.+)", out)
         rsmi_ver = m1.group(1).strip() if m1 else ""
-        rlib_ver = m2.group(1).strip() if m2 else ""
-    except CalledProcessError as e:
+        if not rlib_ver:
+            rlib_ver = m2.group(1).strip() if m2 else ""
+    except (CalledProcessError, OSError) as e:
         logger.warning(f"rocm-smi -V failed: {e}")
     return rsmi_ver, rlib_ver
 
 
-def getGPUMetrics():
-    metrics = json.loads(check_output(["rocm-smi", "-a", "--json"]))
-    logger.info("[X] Retrieved metrics from rocm-smi.")
+def _open_rsmi(backend: str):
+    """rocm_smi_lib напрямую; при backend=auto без библиотеки — None (rocm-smi)."""
+    if backend == "cli":
+        return None
+    try:
+        return rsmi.RSMI()
+    except (OSError, AttributeError, rsmi.RSMIError) as e:
+        if backend == "lib":
+            raise
+        logger.warning(
+            f"rocm_smi_lib unavailable, falling back to rocm-smi: {e}"
+        )
+        return None
+
+
+_ROCM_SMI_CMD = ["rocm-smi", "-a", "--json"]
+
+
+def getGPUMetrics(lib=None):
+    if lib is not None:
+        metrics = lib.snapshot()
+        logger.debug("[X] Retrieved metrics from rocm_smi_lib.")
+        return metrics
+    metrics = json.loads(check_output(_ROCM_SMI_CMD))
+    logger.debug("[X] Retrieved metrics from rocm-smi.")
     return metrics
 
 
-# ===== main =====
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="ROCm SMI Exporter")
-    parser.add_argument(
-        "--addr",
-        default="0.0.0.0",
-        help="Address to bind the HTTP server (default: 0.0.0.0)",
-    )
-    parser.add_argument(
-        "--port",
-        type=int,
-        default=9101,
-        help="Port to bind the HTTP server (default: 9101)",
-    )
-    args = parser.parse_args()
-    start_http_server(port=args.port, addr=args.addr)
-    logger.info(f"[X] Started http server on port {args.addr}:{args.port}...")
+_driver_version = ""
+
 
-    rsmi_ver, rlib_ver = _get_versions()
-    driver_version = ""
-    while True:
-        data = getGPUMetrics()
+def updateGPUMetrics(data, rsmi_ver: str, rlib_ver: str):
+    global _driver_version
 
-        if "system" in data and "Driver version" in data["system"]:
-            driver_version = str(data["system"]["Driver version"]).strip()
+    if "system" in data and "Driver version" in data["system"]:
+        new_driver_version = str(data["system"]["Driver version"]).strip()
+        if new_driver_version != _driver_version:
+            _resolved_keys.clear()
+            _driver_version = new_driver_version
             softwareInfo.labels(
-                driver_version=driver_version,
+                driver_version=_driver_version,
                 rocm_smi_version=rsmi_ver,
                 rocm_smi_lib_version=rlib_ver,
             ).set(1)
 
-        for card, m in data.items():
-            if card == "system":
-                continue
-
-            # >>> robust labels (правит device_name="N/A")
-            dev_name = _pick_label(
-                m,
-                [
-                    "Device Name",
-                    "Card Series",
-                    "Card Model",
-                    "GFX Version",
-                    "Card SKU",
-                ],
-            )
-            dev_id = _pick_label(m, ["Device ID", "Card Model", "PCI Bus"])
-            sub_id = _pick_label(m, ["Subsystem ID", "PCI Bus"])
-
-            labels = {
-                "device_name": dev_name,
-                "device_id": dev_id,
-                "subsystem_id": sub_id,
-            }
-            logger.debug(f"labels for {card}: {labels}")
-
-            # Static info
+    for card, m in data.items():
+        if card == "system":
+            continue
+
+        # >>> robust labels (правит device_name="N/A")
+        dev_name = _pick_label(
+            m,
+            [
+                "Device Name",
+                "Card Series",
+                "Card Model",
+                "GFX Version",
+                "Card SKU",
+            ],
+        )
+        dev_id = _pick_label(m, ["Device ID", "Card Model", "PCI Bus"])
+        sub_id = _pick_label(m, ["Subsystem ID", "PCI Bus"])
+
+        label_values = (dev_name, dev_id, sub_id)
+        children = _bound.get(label_values)
+        if children is None:
+            logger.debug(f"labels for {card}: {label_values}")
+            children = _bound[label_values] = _Children(label_values)
+
+            # Static info — не меняется, выставляется один раз на набор labels
             deviceInfo.labels(
                 device_name=dev_name,
                 device_id=dev_id,
@@ -287,171 +500,102 @@ if __name__ == "__main__":
                 card_vendor=_pick_label(m, ["Card Vendor"]),
             ).set(1)
 
-            # Temps
-            _set_if_not_none(
-                gpuEdgeTemperature,
-                labels,
-                _to_float(
-                    m.get(
-                        _first_key(
-                            m,
-                            [
-                                "Temperature (Sensor edge) (C)",
-                                "temperature_edge (C)",
-                            ],
-                        )
-                    )
-                ),
-            )
-            _set_if_not_none(
-                gpuJunctionTemperature,
-                labels,
-                _to_float(
-                    m.get(
-                        _first_key(
-                            m,
-                            [
-                                "Temperature (Sensor junction) (C)",
-                                "temperature_hotspot (C)",
-                            ],
-                        )
-                    )
-                ),
-            )
-            _set_if_not_none(
-                gpuMemTemperature,
-                labels,
-                _to_float(
-                    m.get(
-                        _first_key(
-                            m,
-                            [
-                                "Temperature (Sensor memory) (C)",
-                                "temperature_mem (C)",
-                            ],
-                        )
-                    )
-                ),
-            )
-
-            # Usage
-            _set_if_not_none(
-                gpuUsage,
-                labels,
-                _to_float(
-                    m.get(
-                        _first_key(
-                            m, ["GPU use (%)", "average_gfx_activity (%)"]
-                        )
-                    )
-                ),
-            )
-            _set_if_not_none(
-                gpuVRAMUsage,
-                labels,
-                _to_float(m.get("GPU Memory Allocated (VRAM%)")),
-            )
-            _set_if_not_none(
-                umcActivity,
-                labels,
-                _to_float(m.get("average_umc_activity (%)")),
-            )
-            _set_if_not_none(
-                mmActivity, labels, _to_float(m.get("average_mm_activity (%)"))
-            )
-
-            # Power
-            now_power_key = _first_key(
-                m,
-                [
-                    "Current Socket Graphics Package Power (W)",
-                    "current_socket_power (W)",
-                ],
-            )
-            avg_sock_key = _first_key(m, ["average_socket_power (W)"])
-            avg_pkg_key = _first_key(m, ["Average Graphics Package Power (W)"])
-            max_pkg_key = _first_key(m, ["Max Graphics Package Power (W)"])
-            _set_if_not_none(
-                socketPowerNow, labels, _to_float(m.get(now_power_key))
-            )
-            _set_if_not_none(
-                socketPowerAvg, labels, _to_float(m.get(avg_sock_key))
-            )
-            _set_if_not_none(
-                pkgPowerAvg, labels, _to_float(m.get(avg_pkg_key))
-            )
-            _set_if_not_none(
-                pkgPowerMax, labels, _to_float(m.get(max_pkg_key))
-            )
-
-            # Voltages
-            for rail_key, rail_name in [
-                ("voltage_soc (mV)", "soc"),
-                ("voltage_gfx (mV)", "gfx"),
-                ("voltage_mem (mV)", "mem"),
-                ("Voltage (mV)", "vcore"),
-            ]:
-                v = _to_float(m.get(rail_key))
-                if v is not None:
-                    voltageMilliV.labels(**labels, rail=rail_name).set(v)
-
-            # Fan
-            _set_if_not_none(
-                fanRpm, labels, _to_float(m.get("current_fan_speed (rpm)"))
-            )
-
-            # Clocks
-            for key, cname in [
-                ("current_gfxclk (MHz)", "gfxclk"),
-                ("current_socclk (MHz)", "socclk"),
-                ("current_uclk (MHz)", "uclk"),
-                ("current_vclk0 (MHz)", "vclk0"),
-                ("current_dclk0 (MHz)", "dclk0"),
-            ]:
-                val = _to_float(m.get(key))
-                if val is not None:
-                    clkCurrentMHz.labels(**labels, clock=cname).set(val)
-
-            for key, cname in [
-                ("average_gfxclk_frequency (MHz)", "gfxclk"),
-                ("average_socclk_frequency (MHz)", "socclk"),
-                ("average_uclk_frequency (MHz)", "uclk"),
-                ("average_vclk0_frequency (MHz)", "vclk0"),
-                ("average_dclk0_frequency (MHz)", "dclk0"),
-            ]:
-                val = _to_float(m.get(key))
-                if val is not None:
-                    clkAverageMHz.labels(**labels, clock=cname).set(val)
-
-            # PCIe
-            width = _to_float(m.get("pcie_link_width (Lanes)"))
-            if width is not None:
-                pcieWidthLanes.labels(**labels).set(width)
-            speed_01 = _to_float(m.get("pcie_link_speed (0.1 GT/s)"))
-            if speed_01 is not None:
-                pcieSpeedGTs.labels(**labels).set(speed_01 * 0.1)
-
-            # Energy
-            _set_if_not_none(
-                energyAccumulatorUJ,
-                labels,
-                _to_float(
-                    m.get(
-                        _first_key(
-                            m,
-                            [
-                                "energy_accumulator (15.259uJ (2^-16))",
-                                "Energy counter",
-                            ],
-                        )
-                    )
-                ),
-            )
-            _set_if_not_none(
-                accumulatedEnergyUJ,
-                labels,
-                _to_float(m.get("Accumulated Energy (uJ)")),
-            )
-
-        logger.info("[X] Refreshed GPU metrics.")
-        time.sleep(1)
+        keys = _resolved_keys.get(card)
+        if keys is None:
+            keys = _resolved_keys[card] = {}
+
+        for name, candidates, scale in _METRIC_SPEC:
+            key = keys.get(name)
+            if key is None or key not in m:
+                key = _first_key(m, candidates)
+                if key is None:
+                    continue
+                keys[name] = key
+            _set(children, name, _to_float(m.get(key), scale=scale))
+
+
+class RocmSmiCollector(Collector):
+    """Снимает метрики по запросу scrape'а, но не чаще раза в min_period.
+
+    Пока Prometheus не ходит — rocm-smi не дёргается; частые scrape'ы
+    получают последний снимок.
+    """
+
+    def __init__(self, lib, rsmi_ver: str, rlib_ver: str, min_period=2.0):
+        self._lib = lib
+        self._rsmi_ver = rsmi_ver
+        self._rlib_ver = rlib_ver
+        self._min_period = min_period
+        self._last = float("-inf")
+        self._lock = threading.Lock()
+
+    def _sample(self):
+        data = getGPUMetrics(self._lib)
+        updateGPUMetrics(data, self._rsmi_ver, self._rlib_ver)
+        lastRefreshTs.set_to_current_time()
+        logger.debug("[X] Refreshed GPU metrics.")
+
+    def describe(self):
+        for gauge in _GAUGES:
+            yield from gauge.describe()
+
+    def collect(self):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last > self._min_period:
+                self._last = now
+                try:
+                    self._sample()
+                except Exception as e:
+                    logger.error(f"[X] Failed to refresh GPU metrics: {e}")
+            # список собирается под lock'ом: параллельный scrape не должен
+            # отдать наполовину обновлённый снимок
+            metrics = [m for gauge in _GAUGES for m in gauge.collect()]
+        return metrics
+
+
+# ===== main =====
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ROCm SMI Exporter")
+    parser.add_argument(
+        "--addr",
+        default="0.0.0.0",
+        help="Address to bind the HTTP server (default: 0.0.0.0)",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=9101,
+        help="Port to bind the HTTP server (default: 9101)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["auto", "lib", "cli"],
+        default="auto",
+        help="Metrics source: rocm_smi_lib (lib), rocm-smi binary (cli) "
+        "or lib with fallback to cli (default: auto)",
+    )
+    parser.add_argument(
+        "--min-period",
+        type=float,
+        default=2.0,
+        help="Minimum seconds between GPU samples; scrapes arriving sooner "
+        "get the cached snapshot (default: 2.0)",
+    )
+    args = parser.parse_args()
+
+    lib = _open_rsmi(args.backend)
+    rsmi_ver, rlib_ver = _get_versions(lib)
+    REGISTRY.register(
+        RocmSmiCollector(lib, rsmi_ver, rlib_ver, min_period=args.min_period)
+    )
+
+    _, server_thread = start_http_server(port=args.port, addr=args.addr)
+    logger.info(f"[X] Started http server on port {args.addr}:{args.port}...")
+    # SIGTERM (docker stop, systemd) -> SystemExit, чтобы отработал finally
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server_thread.join()
+    finally:
+        if lib is not None:
+            lib.shutdown()
@@ -0,0 +1,351 @@
+"""Тонкая ctypes-обёртка над librocm_smi64 (rocm_smi_lib C API).
+
+Снимок отдаётся в том же виде, что и `rocm-smi -a --json` (те же ключи),
+только значения уже числовые — main.py работает с обоими источниками.
+"""
+
+import ctypes
+from ctypes import (
+    POINTER,
+    byref,
+    c_char_p,
+    c_float,
+    c_int,
+    c_int64,
+    c_size_t,
+    c_uint16,
+    c_uint32,
+    c_uint64,
+    c_uint8,
+)
+
+RSMI_STATUS_SUCCESS = 0
+RSMI_INIT_FLAG_NONE = 0
+RSMI_MEM_TYPE_VRAM = 0
+RSMI_SW_COMP_DRIVER = 0
+RSMI_TEMP_TYPE_EDGE = 0
+RSMI_TEMP_TYPE_JUNCTION = 1
+RSMI_TEMP_TYPE_MEMORY = 2
+RSMI_TEMP_CURRENT = 0
+RSMI_VOLT_TYPE_VDDGFX = 0
+RSMI_VOLT_CURRENT = 0
+
+_NAME_LEN = 256
+
+# Поле gpu_metrics, которое firmware не поддерживает, заполнено единицами
+_UNSUPPORTED = {
+    c_uint16: 0xFFFF,
+    c_uint32: 0xFFFFFFFF,
+    c_uint64: 0xFFFFFFFFFFFFFFFF,
+}
+
+
+class RSMIError(Exception):
+    pass
+
+
+class MetricsTableHeader(ctypes.Structure):
+    _fields_ = [
+        ("structure_size", c_uint16),
+        ("format_revision", c_uint8),
+        ("content_revision", c_uint8),
+    ]
+
+
+class RsmiVersion(ctypes.Structure):
+    _fields_ = [
+        ("major", c_uint32),
+        ("minor", c_uint32),
+        ("patch", c_uint32),
+        ("build", c_char_p),
+    ]
+
+
+class GpuMetrics(ctypes.Structure):
+    """rsmi_gpu_metrics_t (v1.x) до current_socket_power включительно.
+
+    Хвост структуры растёт от версии к версии библиотеки, поэтому в конце
+    оставлен запас — библиотека не должна писать за пределы буфера.
+    """
+
+    _fields_ = [
+        ("common_header", MetricsTableHeader),
+        # Temperature
+        ("temperature_edge", c_uint16),
+        ("temperature_hotspot", c_uint16),
+        ("temperature_mem", c_uint16),
+        ("temperature_vrgfx", c_uint16),
+        ("temperature_vrsoc", c_uint16),
+        ("temperature_vrmem", c_uint16),
+        # Utilization
+        ("average_gfx_activity", c_uint16),
+        ("average_umc_activity", c_uint16),
+        ("average_mm_activity", c_uint16),
+        # Power/Energy
+        ("average_socket_power", c_uint16),
+        ("energy_accumulator", c_uint64),
+        ("system_clock_counter", c_uint64),
+        # Average clocks
+        ("average_gfxclk_frequency", c_uint16),
+        ("average_socclk_frequency", c_uint16),
+        ("average_uclk_frequency", c_uint16),
+        ("average_vclk0_frequency", c_uint16),
+        ("average_dclk0_frequency", c_uint16),
+        ("average_vclk1_frequency", c_uint16),
+        ("average_dclk1_frequency", c_uint16),
+        # Current clocks
+        ("current_gfxclk", c_uint16),
+        ("current_socclk", c_uint16),
+        ("current_uclk", c_uint16),
+        ("current_vclk0", c_uint16),
+        ("current_dclk0", c_uint16),
+        ("current_vclk1", c_uint16),
+        ("current_dclk1", c_uint16),
+        ("throttle_status", c_uint32),
+        ("current_fan_speed", c_uint16),
+        # Link width/speed
+        ("pcie_link_width", c_uint16),
+        ("pcie_link_speed", c_uint16),
+        ("padding", c_uint16),
+        ("gfx_activity_acc", c_uint32),
+        ("mem_activity_acc", c_uint32),
+        ("temperature_hbm", c_uint16 * 4),
+        ("firmware_timestamp", c_uint64),
+        # Voltages
+        ("voltage_soc", c_uint16),
+        ("voltage_gfx", c_uint16),
+        ("voltage_mem", c_uint16),
+        ("indep_throttle_status", c_uint64),
+        ("current_socket_power", c_uint16),
+        ("_reserved", c_uint8 * 4096),
+    ]
+
+
+# (поле gpu_metrics, ключ как в `rocm-smi -a --json`)
+_GPU_METRICS_KEYS = (
+    ("temperature_edge", "temperature_edge (C)"),
+    ("temperature_hotspot", "temperature_hotspot (C)"),
+    ("temperature_mem", "temperature_mem (C)"),
+    ("average_gfx_activity", "average_gfx_activity (%)"),
+    ("average_umc_activity", "average_umc_activity (%)"),
+    ("average_mm_activity", "average_mm_activity (%)"),
+    ("average_socket_power", "average_socket_power (W)"),
+    ("current_socket_power", "current_socket_power (W)"),
+    ("energy_accumulator", "energy_accumulator (15.259uJ (2^-16))"),
+    ("average_gfxclk_frequency", "average_gfxclk_frequency (MHz)"),
+    ("average_socclk_frequency", "average_socclk_frequency (MHz)"),
+    ("average_uclk_frequency", "average_uclk_frequency (MHz)"),
+    ("average_vclk0_frequency", "average_vclk0_frequency (MHz)"),
+    ("average_dclk0_frequency", "average_dclk0_frequency (MHz)"),
+    ("current_gfxclk", "current_gfxclk (MHz)"),
+    ("current_socclk", "current_socclk (MHz)"),
+    ("current_uclk", "current_uclk (MHz)"),
+    ("current_vclk0", "current_vclk0 (MHz)"),
+    ("current_dclk0", "current_dclk0 (MHz)"),
+    ("current_fan_speed", "current_fan_speed (rpm)"),
+    ("pcie_link_width", "pcie_link_width (Lanes)"),
+    ("pcie_link_speed", "pcie_link_speed (0.1 GT/s)"),
+    ("voltage_soc", "voltage_soc (mV)"),
+    ("voltage_gfx", "voltage_gfx (mV)"),
+    ("voltage_mem", "voltage_mem (mV)"),
+)
+
+
+_FIELD_TYPES = dict(GpuMetrics._fields_)
+# (поле, ключ, значение-заглушка для неподдерживаемого поля)
+_GPU_METRICS_SPEC = tuple(
+    (field, key, _UNSUPPORTED[_FIELD_TYPES[field]])
+    for field, key in _GPU_METRICS_KEYS
+)
+
+# (ключ, датчик rsmi_dev_temp_metric_get)
+_TEMP_SENSORS = (
+    ("Temperature (Sensor edge) (C)", RSMI_TEMP_TYPE_EDGE),
+    ("Temperature (Sensor junction) (C)", RSMI_TEMP_TYPE_JUNCTION),
+    ("Temperature (Sensor memory) (C)", RSMI_TEMP_TYPE_MEMORY),
+)
+
+# argtypes используемых функций; все возвращают rsmi_status_t
+_PROTOTYPES = {
+    "rsmi_init": (c_uint64,),
+    "rsmi_shut_down": (),
+    "rsmi_num_monitor_devices": (POINTER(c_uint32),),
+    "rsmi_dev_gpu_metrics_info_get": (c_uint32, POINTER(GpuMetrics)),
+    "rsmi_dev_gpu_busy_percent_get": (c_uint32, POINTER(c_uint32)),
+    "rsmi_dev_memory_usage_get": (c_uint32, c_int, POINTER(c_uint64)),
+    "rsmi_dev_memory_total_get": (c_uint32, c_int, POINTER(c_uint64)),
+    "rsmi_dev_id_get": (c_uint32, POINTER(c_uint16)),
+    "rsmi_dev_subsystem_id_get": (c_uint32, POINTER(c_uint16)),
+    "rsmi_dev_name_get": (c_uint32, c_char_p, c_size_t),
+    "rsmi_dev_vendor_name_get": (c_uint32, c_char_p, c_size_t),
+    "rsmi_dev_vbios_version_get": (c_uint32, c_char_p, c_uint32),
+    "rsmi_dev_temp_metric_get": (c_uint32, c_uint32, c_int, POINTER(c_int64)),
+    "rsmi_dev_volt_metric_get": (c_uint32, c_int, c_int, POINTER(c_int64)),
+    "rsmi_dev_power_ave_get": (c_uint32, c_uint32, POINTER(c_uint64)),
+    "rsmi_dev_power_cap_get": (c_uint32, c_uint32, POINTER(c_uint64)),
+    "rsmi_dev_energy_count_get": (
+        c_uint32,
+        POINTER(c_uint64),
+        POINTER(c_float),
+        POINTER(c_uint64),
+    ),
+    "rsmi_version_get": (POINTER(RsmiVersion),),
+    "rsmi_version_str_get": (c_int, c_char_p, c_uint32),
+}
+
+
+class RSMI:
+    def __init__(self, path: str = "librocm_smi64.so"):
+        self._lib = ctypes.CDLL(path)
+        # нет символа — AttributeError, до rsmi_init
+        for name, argtypes in _PROTOTYPES.items():
+            func = getattr(self._lib, name)
+            func.argtypes = argtypes
+            func.restype = c_int
+        self._check("rsmi_init", self._lib.rsmi_init(RSMI_INIT_FLAG_NONE))
+        try:
+            self._n = self.num_devices()
+        except RSMIError:
+            self.shutdown()
+            raise
+        # Буферы выделяются один раз и переиспользуются на каждом снимке
+        self._metrics = (GpuMetrics * self._n)()
+        self._buf = ctypes.create_string_buffer(_NAME_LEN)
+
+    def _check(self, func: str, status: int):
+        if status != RSMI_STATUS_SUCCESS:
+            raise RSMIError(f"{func} failed with status {status}")
+
+    def shutdown(self):
+        self._lib.rsmi_shut_down()
+
+    def version(self) -> str:
+        """Версия загруженной rocm_smi_lib, как в `rocm-smi -V`."""
+        v = RsmiVersion()
+        self._check("rsmi_version_get", self._lib.rsmi_version_get(byref(v)))
+        return f"{v.major}.{v.minor}.{v.patch}"
+
+    def num_devices(self) -> int:
+        n = c_uint32()
+        self._check(
+            "rsmi_num_monitor_devices",
+            self._lib.rsmi_num_monitor_devices(byref(n)),
+        )
+        return n.value
+
+    def gpu_metrics(self, idx: int) -> GpuMetrics:
+        """Буфер карты; перезаписывается следующим вызовом."""
+        m = self._metrics[idx]
+        self._check(
+            "rsmi_dev_gpu_metrics_info_get",
+            self._lib.rsmi_dev_gpu_metrics_info_get(idx, byref(m)),
+        )
+        return m
+
+    def _string(self, func: str, *args) -> str | None:
+        buf = self._buf
+        status = getattr(self._lib, func)(*args, buf, _NAME_LEN)
+        if status != RSMI_STATUS_SUCCESS:
+            return None
+        return buf.value.decode("utf-8", errors="ignore").strip()
+
+    def _int(self, func: str, ctype, *args) -> int | None:
+        v = ctype()
+        if getattr(self._lib, func)(*args, byref(v)) != RSMI_STATUS_SUCCESS:
+            return None
+        return v.value
+
+    def _card(self, idx: int) -> dict:
+        card = {}
+
+        name = self._string("rsmi_dev_name_get", idx)
+        if name:
+            card["Device Name"] = name
+            card["Card Series"] = name
+        vendor = self._string("rsmi_dev_vendor_name_get", idx)
+        if vendor:
+            card["Card Vendor"] = vendor
+        vbios = self._string("rsmi_dev_vbios_version_get", idx)
+        if vbios:
+            card["VBIOS version"] = vbios
+        dev_id = self._int("rsmi_dev_id_get", c_uint16, idx)
+        if dev_id is not None:
+            card["Device ID"] = hex(dev_id)
+        sub_id = self._int("rsmi_dev_subsystem_id_get", c_uint16, idx)
+        if sub_id is not None:
+            card["Subsystem ID"] = hex(sub_id)
+
+        busy = self._int("rsmi_dev_gpu_busy_percent_get", c_uint32, idx)
+        if busy is not None:
+            card["GPU use (%)"] = busy
+        used = self._int(
+            "rsmi_dev_memory_usage_get",
+            c_uint64,
+            idx,
+            RSMI_MEM_TYPE_VRAM,
+        )
+        total = self._int(
+            "rsmi_dev_memory_total_get",
+            c_uint64,
+            idx,
+            RSMI_MEM_TYPE_VRAM,
+        )
+        if used is not None and total:
+            card["GPU Memory Allocated (VRAM%)"] = round(100.0 * used / total)
+
+        # Датчики hwmon — те же значения, что `rocm-smi -a` показывает и на
+        # картах без gpu_metrics
+        for key, sensor in _TEMP_SENSORS:
+            t = self._int(
+                "rsmi_dev_temp_metric_get",
+                c_int64,
+                idx,
+                sensor,
+                RSMI_TEMP_CURRENT,
+            )
+            if t is not None:
+                card[key] = t / 1000  # м°C
+        volt = self._int(
+            "rsmi_dev_volt_metric_get",
+            c_int64,
+            idx,
+            RSMI_VOLT_TYPE_VDDGFX,
+            RSMI_VOLT_CURRENT,
+        )
+        if volt is not None:
+            card["Voltage (mV)"] = volt
+        power = self._int("rsmi_dev_power_ave_get", c_uint64, idx, 0)
+        if power is not None:
+            card["Average Graphics Package Power (W)"] = power / 1e6  # мкВт
+        cap = self._int("rsmi_dev_power_cap_get", c_uint64, idx, 0)
+        if cap is not None:
+            card["Max Graphics Package Power (W)"] = cap / 1e6
+        energy, resolution, ts = c_uint64(), c_float(), c_uint64()
+        status = self._lib.rsmi_dev_energy_count_get(
+            idx, byref(energy), byref(resolution), byref(ts)
+        )
+        if status == RSMI_STATUS_SUCCESS:
+            card["Energy counter"] = energy.value
+            card["Accumulated Energy (uJ)"] = round(
+                energy.value * resolution.value, 2
+            )
+
+        try:
+            m = self.gpu_metrics(idx)
+        except RSMIError:
+            return card
+        for field, key, unsupported in _GPU_METRICS_SPEC:
+            v = getattr(m, field)
+            if v != unsupported:
+                card[key] = v
+        return card
+
+    def snapshot(self) -> dict:
+        """Снимок всех карт в формате `rocm-smi -a --json`."""
+        data = {}
+        driver = self._string("rsmi_version_str_get", RSMI_SW_COMP_DRIVER)
+        if driver:
+            data["system"] = {"Driver version": driver}
+        for idx in range(self._n):
+            data[f"card{idx}"] = self._card(idx)
+        return data